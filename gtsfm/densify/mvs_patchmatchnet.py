@@ -104,6 +104,7 @@ class MVSPatchmatchNet(MVSBase):
             batch_size=BATCH_SIZE,
             shuffle=False,
             num_workers=num_workers,
+            pin_memory=torch.cuda.is_available(),
             drop_last=False,
         )
 
@@ -2,17 +2,15 @@
 
 Authors: Ren Liu, Ayush Baid
 """
-import math
-from typing import Tuple
+from typing import Tuple, Union
 
 import numpy as np
-from gtsam import PinholeCameraCal3Bundler, Unit3
+from gtsam import PinholeCameraCal3Bundler
 from scipy.spatial import KDTree
 
 import gtsfm.visualization.open3d_vis_utils as open3d_vis_utils
 from gtsfm.evaluation.metrics import GtsfmMetric, GtsfmMetricsGroup
 from gtsfm.utils import ellipsoid as ellipsoid_utils
-from gtsfm.utils import geometry_comparisons as geometry_utils
 
 
 def calculate_triangulation_angle_in_degrees(
@@ -37,14 +35,13 @@ def calculate_triangulation_angle_in_degrees(
     Returns:
         the angle formed at the 3d point, in degrees.
     """
-    camera_center_1: np.ndarray = camera_1.pose().translation()
-    camera_center_2: np.ndarray = camera_2.pose().translation()
-
-    # compute the two rays
-    ray_1 = point_3d - camera_center_1
-    ray_2 = point_3d - camera_center_2
-
-    return geometry_utils.compute_relative_unit_translation_angle(Unit3(ray_1), Unit3(ray_2))
+    return float(
+        calculate_triangulation_angles_in_degrees_from_centers(
+            camera_centers_1=camera_1.pose().translation(),
+            camera_centers_2=camera_2.pose().translation(),
+            points_3d=point_3d,
+        )
+    )
 
 
 def calculate_triangulation_angles_in_degrees(
@@ -71,26 +68,43 @@ def calculate_triangulation_angles_in_degrees(
 
     https://github.com/colmap/colmap/blob/dev/src/base/triangulation.cc#L147
     """
-    camera_center_1: np.ndarray = camera_1.pose().translation()
-    camera_center_2: np.ndarray = camera_2.pose().translation()
+    return calculate_triangulation_angles_in_degrees_from_centers(
+        camera_centers_1=camera_1.pose().translation().reshape(1, 3),
+        camera_centers_2=camera_2.pose().translation().reshape(1, 3),
+        points_3d=points_3d,
+    )
+
+
+def calculate_triangulation_angles_in_degrees_from_centers(
+    camera_centers_1: np.ndarray, camera_centers_2: np.ndarray, points_3d: np.ndarray
+) -> np.ndarray:
+    """Vectorized calculation of the triangulation angles for a batch of (camera center, camera center, point) triplets.
 
-    N = points_3d.shape[0]
-    # ensure broadcasting is in the correct direction
-    rays1 = points_3d - camera_center_1.reshape(1, 3)
-    rays2 = points_3d - camera_center_2.reshape(1, 3)
+    All inputs are broadcast against each other along the leading dimension, so e.g. a single 3d point of shape (3,)
+    can be paired with N camera center pairs of shape (N,3).
+
+    Args:
+        camera_centers_1: (N,3) centers of the first cameras, in the world frame.
+        camera_centers_2: (N,3) centers of the second cameras, in the world frame.
+        points_3d: (N,3) 3d points at which the angles between the light rays from both cameras are computed.
+
+    Returns:
+        array of shape (N,) with the angles formed at the 3d points, in degrees.
+    """
+    rays_1 = points_3d - camera_centers_1
+    rays_2 = points_3d - camera_centers_2
 
     # normalize rays to unit length
-    rays1 /= np.linalg.norm(rays1, axis=1).reshape(N, 1)
-    rays2 /= np.linalg.norm(rays2, axis=1).reshape(N, 1)
+    rays_1 = rays_1 / np.linalg.norm(rays_1, axis=-1, keepdims=True)
+    rays_2 = rays_2 / np.linalg.norm(rays_2, axis=-1, keepdims=True)
 
-    dot_products = np.multiply(rays1, rays2).sum(axis=1)
-    dot_products = np.clip(dot_products, -1, 1)
-    angles_rad = np.arccos(dot_products)
-    angles_deg = np.rad2deg(angles_rad)
-    return angles_deg
+    dot_products = np.clip(np.sum(rays_1 * rays_2, axis=-1), -1, 1)
+    return np.rad2deg(np.arccos(dot_products))
 
 
-def piecewise_gaussian(theta: float, theta_0: float = 5, sigma_1: float = 1, sigma_2: float = 10) -> float:
+def piecewise_gaussian(
+    theta: Union[float, np.ndarray], theta_0: float = 5, sigma_1: float = 1, sigma_2: float = 10
+) -> Union[float, np.ndarray]:
     """A Gaussian function that favors a certain baseline angle (theta_0).
 
     The Gaussian function is divided into two pieces with different standard deviations:
@@ -100,24 +114,21 @@ def piecewise_gaussian(theta: float, theta_0: float = 5, sigma_1: float = 1, sig
     More details can be found in "View Selection" paragraphs in Yao's paper https://arxiv.org/abs/1804.02505.
 
     Args:
-        theta: the input baseline angle.
+        theta: the input baseline angle, or an array of baseline angles of any shape.
         theta_0: defaults to 5, the expected baseline angle of the function.
         sigma_1: defaults to 1, the standard deviation of the function when the angle is no larger than theta_0.
         sigma_2: defaults to 10, the standard deviation of the function when the angle is larger than theta_0.
 
     Returns:
-        the result of the Gaussian function, in range (0, 1]
+        the result of the Gaussian function, in range (0, 1], with the same shape as theta.
     """
+    theta = np.asarray(theta, dtype=np.float64)
 
     # Decide the standard deviation according to theta and theta_0
-    # if theta is no larger than theta_0, the standard deviation is sigma_1
-    if theta <= theta_0:
-        sigma = sigma_1
-    # if theta is larger than theta_0, the standard deviation is sigma_2
-    else:
-        sigma = sigma_2
+    # if theta is no larger than theta_0, the standard deviation is sigma_1, otherwise it is sigma_2
+    sigma = np.where(theta <= theta_0, sigma_1, sigma_2)
 
-    return math.exp(-((theta - theta_0) ** 2) / (2 * sigma ** 2))
+    return np.exp(-((theta - theta_0) ** 2) / (2 * sigma ** 2))
 
 
 def cart_to_homogenous(
@@ -128,7 +139,8 @@ def cart_to_homogenous(
         non_homogenous_coordinates: d-dim non-homogenous coordinates, of shape dxN.
 
     Returns:
-        (d+1)-dim homogenous coordinates, of shape (d+1)xN.
+        (d+1)-dim homogenous coordinates, of shape (d+1)xN. float32 and float64 inputs keep their dtype, inputs of
+            any other dtype are converted to float64.
 
     Raises:
         TypeError if input non_homogenous_coordinates is not 2 dimensional.
@@ -137,9 +149,17 @@ def cart_to_homogenous(
     if len(non_homogenous_coordinates.shape) != 2:
         raise TypeError("Input non-homogenous coordinates should be 2 dimensional")
 
-    n = non_homogenous_coordinates.shape[1]
+    d, n = non_homogenous_coordinates.shape
+    dtype = non_homogenous_coordinates.dtype
+    if dtype not in (np.float32, np.float64):
+        dtype = np.float64
+
+    # write into a preallocated output, instead of allocating a row of ones and copying both again with np.vstack
+    homogenous_coordinates = np.empty((d + 1, n), dtype=dtype)
+    homogenous_coordinates[:d] = non_homogenous_coordinates
+    homogenous_coordinates[d] = 1
 
-    return np.vstack([non_homogenous_coordinates, np.ones((1, n))])
+    return homogenous_coordinates
 
 
 def estimate_voxel_scales(points: np.ndarray) -> np.ndarray:
@@ -156,9 +176,7 @@ def estimate_voxel_scales(points: np.ndarray) -> np.ndarray:
     centered_points = ellipsoid_utils.center_point_cloud(points)
 
     # get semi-axis lengths in all axes of the centered point cloud
-    _, singular_values = ellipsoid_utils.get_right_singular_vectors(centered_points)
-
-    return singular_values
+    return ellipsoid_utils.get_singular_values(centered_points)
 
 
 def estimate_minimum_voxel_size(points: np.ndarray, scale: float = 0.02) -> float:
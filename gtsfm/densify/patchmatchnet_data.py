@@ -108,45 +108,43 @@ class PatchmatchNetData(Dataset):
 
         for j in range(num_tracks):
             track = self._sfm_result.get_track(j)
-            num_measurements = track.numberMeasurements()
-            measurements = [track.measurement(k) for k in range(num_measurements)]
             wtj = track.point3()
-            for k1 in range(num_measurements):
-                i1, _ = measurements[k1]
-                # Check if i1 is a valid image with estimated camera pose, then get its id for patchmatchnet
-                if i1 not in self._camera_idx_to_patchmatchnet_idx:
-                    # Calculate the depth only if i1 is an image with estimated pose
-                    logger.info("Camera %d had no estimated pose, so skipping during MVS.", i1)
+
+            # Collect the patchmatchnet indices and camera centers of all measurements from valid cameras
+            pm_idxs = []
+            camera_centers = []
+            for k in range(track.numberMeasurements()):
+                i, _ = track.measurement(k)
+                # Check if i is a valid image with estimated camera pose, then get its id for patchmatchnet
+                if i not in self._camera_idx_to_patchmatchnet_idx:
+                    # Calculate the depth and scores only if i is an image with estimated pose
+                    logger.info("Camera %d had no estimated pose, so skipping during MVS.", i)
                     continue
-                pm_i1 = self._camera_idx_to_patchmatchnet_idx[i1]
-
-                # Calculate track j's depth in the camera i1 frame
-                z1 = self._sfm_result.get_camera(i1).pose().transformTo(wtj)[-1]
-                # Update image i1's depth list only when i1 in a valid camera
-                depths[pm_i1].append(z1)
-
-                for k2 in range(k1 + 1, num_measurements):
-                    i2, _ = measurements[k2]
-
-                    # Check if i2 is a valid image with estimated camera pose, then get its id for patchmatchnet
-                    if i2 not in self._camera_idx_to_patchmatchnet_idx:
-                        # Calculate the pairwise gaussian score only if i1 and i2 are both images with estimated poses
-                        logger.info("Camera %d had no estimated pose, so skipping during MVS.", i2)
-                        continue
-                    pm_i2 = self._camera_idx_to_patchmatchnet_idx[i2]
-
-                    # If both cameras are valid, calculate the score of track j in view pair (pm_i1, pm_i2)
-                    #   1. calculate the baseline angle of track j
-                    theta_i1_i2 = mvs_utils.calculate_triangulation_angle_in_degrees(
-                        camera_1=self._sfm_result.get_camera(i1),
-                        camera_2=self._sfm_result.get_camera(i2),
-                        point_3d=wtj,
-                    )
-                    #   2. calculate the result of the Gaussian function as the score
-                    score_i1_i2 = mvs_utils.piecewise_gaussian(theta=theta_i1_i2)
-                    #   3. add the score of track j to the total score of view pair (pm_i1, pm_i2)
-                    pair_scores[pm_i2, pm_i1] += score_i1_i2
-                    pair_scores[pm_i1, pm_i2] += score_i1_i2
+                pm_i = self._camera_idx_to_patchmatchnet_idx[i]
+                wTi = self._sfm_result.get_camera(i).pose()
+
+                # Calculate track j's depth in the camera i frame
+                depths[pm_i].append(wTi.transformTo(wtj)[-1])
+                pm_idxs.append(pm_i)
+                camera_centers.append(wTi.translation())
+
+            if len(pm_idxs) < 2:
+                continue
+
+            # Calculate the scores of track j in all view pairs (pm_i1, pm_i2) at once
+            pm_idxs = np.array(pm_idxs)
+            camera_centers = np.array(camera_centers)
+            k1, k2 = np.triu_indices(len(pm_idxs), k=1)
+            #   1. calculate the baseline angles of track j
+            theta_i1_i2 = mvs_utils.calculate_triangulation_angles_in_degrees_from_centers(
+                camera_centers_1=camera_centers[k1], camera_centers_2=camera_centers[k2], points_3d=wtj
+            )
+            #   2. calculate the result of the Gaussian function as the scores
+            score_i1_i2 = mvs_utils.piecewise_gaussian(theta=theta_i1_i2)
+            #   3. add the scores of track j to the total scores of view pairs (pm_i1, pm_i2), accumulating repeated
+            #   pairs (unbuffered, unlike fancy-indexed +=)
+            np.add.at(pair_scores, (pm_idxs[k2], pm_idxs[k1]), score_i1_i2)
+            np.add.at(pair_scores, (pm_idxs[k1], pm_idxs[k2]), score_i1_i2)
 
         # Sort pair scores, for i-th row, choose the largest (num_views-1) scores, the corresponding views are selected
         #   as (num_views-1) source views for i-th reference view.
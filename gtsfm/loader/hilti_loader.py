@@ -13,9 +13,9 @@ Kalibr format for intrinsics: https://github.com/ethz-asl/kalibr/wiki/yaml-forma
 
 Authors: Ayush Baid
 """
-import glob
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 import yaml
 
 import numpy as np
@@ -45,6 +45,9 @@ LIDAR_POSE_RELATIVE_PATH = "lidar/fastlio2.g2o"
 LIDAR_CONSTRAINTS_RELATIVE_PATH = "lidar/constraints.txt"
 IMAGES_FOLDER = "images"
 
+# Use the libyaml-backed safe loader when PyYAML was built with it, as it is much faster than the pure-Python one.
+YAML_SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 HARD_RELATIVE_POSE_PRIOR_SIGMA = np.ones((6,)) * 1e-3  # CAM_IMU_POSE_PRIOR_SIGMA in BA should have similar value
 SOFT_RELATIVE_POSE_PRIOR_SIGMA = np.ones((6,)) * 3e-2
 SOFT_ABSOLUTE_POSE_PRIOR_SIGMA = np.ones((6,)) * 3e-2
@@ -69,16 +72,28 @@ class HiltiLoader(LoaderBase):
         self._base_folder: Path = Path(base_folder)
         self._max_length = max_length
 
-        # Load calibration.
+        # Load calibration, parsing each kalibr file only once (cameras 0 and 1 share a file).
+        kalibr_files: Dict[str, Dict[str, Any]] = {}
         self._intrinsics: Dict[int, Cal3Fisheye] = {}
         self._cam_T_imu_poses: Dict[int, Pose3] = {}
         for cam_idx in range(NUM_CAMS):
-            calibration = self.__load_calibration(cam_idx)
+            calibration = self.__load_calibration(cam_idx, kalibr_files)
             self._intrinsics[cam_idx] = calibration[0]
             self._cam_T_imu_poses[cam_idx] = calibration[1]
+        # Cache the inverses, as every pose and pose prior query needs imu_T_cam.
+        self._imu_T_cam_poses: Dict[int, Pose3] = {
+            cam_idx: cam_T_imu.inverse() for cam_idx, cam_T_imu in self._cam_T_imu_poses.items()
+        }
+        # Relative poses between cameras on the same rig only depend on the calibration, so compute them once.
+        self._i2_T_i1_same_rig: Dict[Tuple[int, int], Pose3] = {
+            (cam_idx_for_i1, cam_idx_for_i2): imu_T_i2.between(imu_T_i1)
+            for cam_idx_for_i1, imu_T_i1 in self._imu_T_cam_poses.items()
+            for cam_idx_for_i2, imu_T_i2 in self._imu_T_cam_poses.items()
+        }
 
         # Check how many images are on disk.
-        self.num_rig_poses: int = self.__get_num_rig_poses()
+        self._image_file_names: FrozenSet[str] = self.__list_image_file_names()
+        self.num_rig_poses: int = len(self._image_file_names) // NUM_CAMS
         if self._max_length is not None:
             self.num_rig_poses = min(self.num_rig_poses, self._max_length)
 
@@ -97,7 +112,8 @@ class HiltiLoader(LoaderBase):
         constraints = Constraint.read(str(constraints_path))
 
         # filter them according to max length
-        constraints = list(filter(lambda c: c.a < self.num_rig_poses and c.b < self.num_rig_poses, constraints))
+        n = self.num_rig_poses
+        constraints = [c for c in constraints if c.a < n and c.b < n]
 
         return constraints
 
@@ -109,40 +125,44 @@ class HiltiLoader(LoaderBase):
         filepath = str(self._base_folder / LIDAR_POSE_RELATIVE_PATH)
         _, values = gtsam.readG2o(filepath, is3D=True)
 
-        lidar_keys = values.keys()
-        logger.info("Number of keys in g2o file: %d", len(lidar_keys))
-
-        w_T_imu: Dict[int, Pose3] = {}
+        logger.info("Number of keys in g2o file: %d", values.size())
 
-        for rig_idx in range(self.num_rig_poses):
-            if rig_idx in lidar_keys:
-                w_T_imu[rig_idx] = values.atPose3(rig_idx)
+        # Values.exists() is a tree lookup, so checking each rig index stays cheap.
+        return {rig_idx: values.atPose3(rig_idx) for rig_idx in range(self.num_rig_poses) if values.exists(rig_idx)}
 
-        return w_T_imu
+    def __list_image_file_names(self) -> FrozenSet[str]:
+        """List the names of the images we have on disk, with a single directory listing."""
+        with os.scandir(self._base_folder / IMAGES_FOLDER) as entries:
+            # Skip hidden files and anything that is not a regular file, as those are not images.
+            return frozenset(
+                entry.name
+                for entry in entries
+                if entry.name.endswith(".jpg") and not entry.name.startswith(".") and entry.is_file()
+            )
 
-    def __get_num_rig_poses(self) -> int:
-        """Check how many images we have on disk and deduce number of rig poses."""
-        search_path: str = str(self._base_folder / IMAGES_FOLDER / "*.jpg")
-        image_files = glob.glob(search_path)
-        total_num_images = len(image_files)
-        return total_num_images // NUM_CAMS
+    def __load_calibration(self, cam_idx: int, kalibr_files: Dict[str, Dict[str, Any]]) -> Tuple[Cal3Fisheye, Pose3]:
+        """Load calibration from kalibr files in calibration sub-folder.
 
-    def __load_calibration(self, cam_idx: int) -> Tuple[Cal3Fisheye, Pose3]:
-        """Load calibration from kalibr files in calibration sub-folder."""
-        kalibr_file_path = self._base_folder / "calibration" / CAM_IDX_TO_KALIBR_FILE_MAP[cam_idx]
+        Args:
+            cam_idx: index of the camera on the rig.
+            kalibr_files: already parsed kalibr files, keyed by file name. Updated in place if the file for this camera
+                has not been parsed yet.
+        """
+        kalibr_file_name = CAM_IDX_TO_KALIBR_FILE_MAP[cam_idx]
+        if kalibr_file_name not in kalibr_files:
+            with open(self._base_folder / "calibration" / kalibr_file_name, "r") as file:
+                kalibr_files[kalibr_file_name] = yaml.load(file, Loader=YAML_SAFE_LOADER)
 
-        with open(kalibr_file_path, "r") as file:
-            calibration_data = yaml.safe_load(file)
-            if cam_idx != 1:
-                calibration_data = calibration_data["cam0"]
-            else:
-                calibration_data = calibration_data["cam1"]
+        if cam_idx != 1:
+            calibration_data = kalibr_files[kalibr_file_name]["cam0"]
+        else:
+            calibration_data = kalibr_files[kalibr_file_name]["cam1"]
 
-            assert calibration_data["camera_model"] == "pinhole"
-            assert calibration_data["distortion_model"] == "equidistant"
+        assert calibration_data["camera_model"] == "pinhole"
+        assert calibration_data["distortion_model"] == "equidistant"
 
-            intrinsics: Cal3Fisheye = self.__load_intrinsics(calibration_data)
-            cam_T_imu: Pose3 = self.__load_pose_relative_to_imu(calibration_data)
+        intrinsics: Cal3Fisheye = self.__load_intrinsics(calibration_data)
+        cam_T_imu: Pose3 = self.__load_pose_relative_to_imu(calibration_data)
 
         return intrinsics, cam_T_imu
 
@@ -201,7 +221,12 @@ class HiltiLoader(LoaderBase):
         Returns:
             Image: the image at the query index.
         """
-        image_path: Path = self._base_folder / IMAGES_FOLDER / f"{index}.jpg"
+        image_file_name = f"{index}.jpg"
+        # Check against the listing from init, so that missing images do not hit the filesystem.
+        if image_file_name not in self._image_file_names:
+            raise IndexError(f"Image index {index} is invalid")
+
+        image_path: Path = self._base_folder / IMAGES_FOLDER / image_file_name
 
         return io_utils.load_image(str(image_path))
 
@@ -217,7 +242,7 @@ class HiltiLoader(LoaderBase):
         Returns:
             intrinsics for the given camera.
         """
-        return self._intrinsics[self.camera_from_image(index)]
+        return self._intrinsics[index % NUM_CAMS]
 
     def get_camera_pose(self, index: int) -> Optional[Pose3]:
         """Get the camera pose (in world coordinates) at the given index.
@@ -230,11 +255,10 @@ class HiltiLoader(LoaderBase):
         Returns:
             the camera pose w_P_index.
         """
-        rig_idx: int = self.rig_from_image(index)
-        cam_idx: int = self.camera_from_image(index)
+        rig_idx, cam_idx = divmod(index, NUM_CAMS)
 
         if rig_idx in self._w_T_imu:
-            return self._w_T_imu[rig_idx] * self._cam_T_imu_poses[cam_idx].inverse()
+            return self._w_T_imu[rig_idx] * self._imu_T_cam_poses[cam_idx]
 
         return None
 
@@ -252,22 +276,19 @@ class HiltiLoader(LoaderBase):
         Returns:
             Pose prior, if it exists.
         """
-        rig_idx_for_i1: int = self.rig_from_image(i1)
-        rig_idx_for_i2: int = self.rig_from_image(i2)
-        cam_idx_for_i1: int = self.camera_from_image(i1)
-        cam_idx_for_i2: int = self.camera_from_image(i2)
+        # Inline rig_from_image() and camera_from_image(), as this is called for every image pair.
+        rig_idx_for_i1, cam_idx_for_i1 = divmod(i1, NUM_CAMS)
+        rig_idx_for_i2, cam_idx_for_i2 = divmod(i2, NUM_CAMS)
 
         # TODO(Frank): this should come from constraints?
 
         if rig_idx_for_i1 == rig_idx_for_i2:
-            i1_T_imu: Pose3 = self._cam_T_imu_poses[cam_idx_for_i1]
-            i2_T_imu: Pose3 = self._cam_T_imu_poses[cam_idx_for_i2]
-            i2Ti1 = i2_T_imu.inverse().between(i1_T_imu.inverse())
+            i2Ti1 = self._i2_T_i1_same_rig[(cam_idx_for_i1, cam_idx_for_i2)]
             # TODO: add covariance
             return PosePrior(value=i2Ti1, covariance=HARD_RELATIVE_POSE_PRIOR_SIGMA, type=PosePriorType.HARD_CONSTRAINT)
         elif rig_idx_for_i1 in self._w_T_imu and rig_idx_for_i2 in self._w_T_imu:
-            w_T_i1 = self._w_T_imu[rig_idx_for_i1] * self._cam_T_imu_poses[cam_idx_for_i1].inverse()
-            w_T_i2 = self._w_T_imu[rig_idx_for_i2] * self._cam_T_imu_poses[cam_idx_for_i2].inverse()
+            w_T_i1 = self._w_T_imu[rig_idx_for_i1] * self._imu_T_cam_poses[cam_idx_for_i1]
+            w_T_i2 = self._w_T_imu[rig_idx_for_i2] * self._imu_T_cam_poses[cam_idx_for_i2]
             i2Ti1 = w_T_i2.between(w_T_i1)
             # TODO: add covariance
             return PosePrior(value=i2Ti1, covariance=SOFT_RELATIVE_POSE_PRIOR_SIGMA, type=PosePriorType.SOFT_CONSTRAINT)
@@ -275,11 +296,10 @@ class HiltiLoader(LoaderBase):
         return None
 
     def get_absolute_pose_prior(self, idx: int) -> Optional[PosePrior]:
-        rig_idx: int = self.rig_from_image(idx)
-        cam_idx: int = self.camera_from_image(idx)
+        rig_idx, cam_idx = divmod(idx, NUM_CAMS)
 
         if rig_idx in self._w_T_imu:
-            w_T_cam = self._w_T_imu[rig_idx] * self._cam_T_imu_poses[cam_idx].inverse()
+            w_T_cam = self._w_T_imu[rig_idx] * self._imu_T_cam_poses[cam_idx]
             return PosePrior(
                 value=w_T_cam, covariance=SOFT_ABSOLUTE_POSE_PRIOR_SIGMA, type=PosePriorType.SOFT_CONSTRAINT
             )
@@ -299,14 +319,21 @@ class HiltiLoader(LoaderBase):
         return rig_index * NUM_CAMS + camera_idx
 
     def get_relative_pose_priors(self, pairs: List[Tuple[int, int]]) -> Dict[Tuple[int, int], PosePrior]:
-        pairs = set(pairs)
         # For every rig index, add a "star" from camera 2 to 0,1,3,4:
-        for rig_index in range(self.num_rig_poses):
-            camera_2 = self.image_from_rig_and_camera(rig_index, 2)
-            for cam_idx in [0, 1, 3, 4]:
-                pairs.add((camera_2, self.image_from_rig_and_camera(rig_index, cam_idx)))
-
-        priors = {pair: self.get_relative_pose_prior(*pair) for pair in pairs}
+        rig_idxs = np.arange(self.num_rig_poses, dtype=np.int64)
+        star_pairs = np.stack(
+            [
+                np.repeat(rig_idxs * NUM_CAMS + 2, 4),
+                (rig_idxs.reshape(-1, 1) * NUM_CAMS + np.array([0, 1, 3, 4])).reshape(-1),
+            ],
+            axis=1,
+        )
+        # Deduplicate the input pairs and the star pairs together; sorted as a side effect.
+        unique_pairs = np.unique(
+            np.concatenate([np.array(pairs, dtype=np.int64).reshape(-1, 2), star_pairs], axis=0), axis=0
+        )
+
+        priors = {(i1, i2): self.get_relative_pose_prior(i1, i2) for i1, i2 in unique_pairs.tolist()}
         priors = {pair: prior for pair, prior in priors.items() if prior is not None}
 
         return priors
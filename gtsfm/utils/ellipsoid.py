@@ -135,7 +135,7 @@ def get_right_singular_vectors(A: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
     N, D = A.shape
     if D != 3:
-        raise TypeError("Point Cloud should be 3 dimesional")
+        raise TypeError("Point Cloud should be 3 dimensional")
 
     # eigenvectors of A^T*A are singular vectors of A
     # we apply Bessel's correction when estimating the covariance matrix
@@ -146,3 +146,29 @@ def get_right_singular_vectors(A: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     sort_idxs = np.argsort(-eigvals)
 
     return eigvecs[:, sort_idxs], np.sqrt(eigvals[sort_idxs])
+
+
+def get_singular_values(A: np.ndarray) -> np.ndarray:
+    """Computes only the singular values of the point cloud, as used for the semi-axis lengths of its ellipsoid.
+
+    Unlike get_right_singular_vectors(), this skips the eigenvectors and uses the symmetric eigensolver on the 3x3
+    covariance matrix, which is cheaper and guaranteed to return real eigenvalues.
+
+    Args:
+        A: point cloud of shape (N,3)
+
+    Returns:
+        The singular values of the point cloud (sorted in descending order), with shape (3,)
+
+    Raises:
+        TypeError: if point cloud is not of shape (N,3).
+    """
+    N, D = A.shape
+    if D != 3:
+        raise TypeError("Point Cloud should be 3 dimensional")
+
+    # we apply Bessel's correction when estimating the covariance matrix, as in get_right_singular_vectors()
+    # eigvalsh returns the eigenvalues in ascending order; clip round-off below zero for degenerate point clouds
+    eigvals = np.linalg.eigvalsh(A.T @ A / (N - 1))
+
+    return np.sqrt(np.maximum(eigvals[::-1], 0))
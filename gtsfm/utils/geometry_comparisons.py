@@ -2,7 +2,7 @@
 
 Authors: Ayush Baid, John Lambert
 """
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 
 import gtsam
 import numpy as np
@@ -76,9 +76,8 @@ def align_poses_sim3_ignore_missing(
     num_cameras = len(aTi_list)
     # now at valid indices
     aTi_list_ = [None] * num_cameras
-    for i in range(num_cameras):
-        if i in valid_camera_idxs:
-            aTi_list_[i] = valid_aTi_list_.pop(0)
+    for i, aTi_ in zip(valid_camera_idxs, valid_aTi_list_):
+        aTi_list_[i] = aTi_
 
     return aTi_list_, aSb
 
@@ -121,11 +120,12 @@ def align_poses_sim3(aTi_list: List[Pose3], bTi_list: List[Pose3]) -> Tuple[List
 
         # align the rotations first, so that we can find the translation between the two panoramas
         aSb = Similarity3(aSb.rotation(), np.zeros((3,)), 1.0)
-        aTi_list_rot_aligned = [aSb.transformFrom(bTi) for _, bTi in valid_pose_tuples]
 
         # fit a single translation motion to the centroid
         aTi_centroid = np.array([aTi.translation() for aTi, _ in valid_pose_tuples]).mean(axis=0)
-        aTi_rot_aligned_centroid = np.array([aTi.translation() for aTi in aTi_list_rot_aligned]).mean(axis=0)
+        # rotating the translations is linear, so rotate their centroid instead of transforming every pose
+        bTi_centroid = np.array([bTi.translation() for _, bTi in valid_pose_tuples]).mean(axis=0)
+        aTi_rot_aligned_centroid = aSb.rotation().matrix() @ bTi_centroid
 
         # construct the final SIM3 transform
         aSb = Similarity3(aSb.rotation(), aTi_centroid - aTi_rot_aligned_centroid, 1.0)
@@ -143,18 +143,32 @@ def align_poses_sim3(aTi_list: List[Pose3], bTi_list: List[Pose3]) -> Tuple[List
     logger.info(f"Sim(3) Translation `atb`: [tx,ty,tz]={str(np.round(atb,2))}")
     logger.info("Sim(3) Scale `asb`: %.2f", float(aSb.scale()))
 
-    aTi_list_ = []
-    for bTi in bTi_list:
-        if bTi is None:
-            aTi_list_.append(None)
-        else:
-            aTi_list_.append(aSb.transformFrom(bTi))
+    aTi_list_ = [aSb.transformFrom(bTi) if bTi is not None else None for bTi in bTi_list]
 
     logger.info("Pose graph Sim(3) alignment complete.")
 
     return aTi_list_, aSb
 
 
+def _get_common_valid_indices(a_list: List[Optional[Any]], b_list: List[Optional[Any]]) -> Optional[List[int]]:
+    """Get the indices of the non-None entries, if both lists have them at the same locations.
+
+    Args:
+        a_list: 1st list, of the same length as b_list.
+        b_list: 2nd list.
+
+    Returns:
+        Indices of the valid entries, or None as soon as an entry is valid in only one of the lists.
+    """
+    valid_idxs = []
+    for i, (a, b) in enumerate(zip(a_list, b_list)):
+        if (a is None) != (b is None):
+            return None
+        if a is not None:
+            valid_idxs.append(i)
+    return valid_idxs
+
+
 def compare_rotations(
     aRi_list: List[Optional[Rot3]], bRi_list: List[Optional[Rot3]], angular_error_threshold_degrees: float
 ) -> bool:
@@ -174,23 +188,22 @@ def compare_rotations(
         return False
 
     # check the presense of valid Rot3 objects in the same location
-    aRi_valid = [i for (i, aRi) in enumerate(aRi_list) if aRi is not None]
-    bRi_valid = [i for (i, bRi) in enumerate(bRi_list) if bRi is not None]
-    if aRi_valid != bRi_valid:
+    valid_idxs = _get_common_valid_indices(aRi_list, bRi_list)
+    if valid_idxs is None:
         return False
 
-    if len(aRi_valid) <= 1:
+    if len(valid_idxs) <= 1:
         # we need >= two entries going forward for meaningful comparisons
         return False
 
-    aRi_list = [aRi_list[i] for i in aRi_valid]
-    bRi_list = [bRi_list[i] for i in bRi_valid]
+    # only drop the invalid entries if there are any, to avoid copying the lists in the common case
+    if len(valid_idxs) != len(aRi_list):
+        aRi_list = [aRi_list[i] for i in valid_idxs]
+        bRi_list = [bRi_list[i] for i in valid_idxs]
 
     # frame 'a' is the target/reference, and bRi_list will be transformed
     aRi_list_ = align_rotations(aRi_list, bRi_list)
-    relative_rotations_angles = np.array(
-        [compute_relative_rotation_angle(aRi, aRi_) for (aRi, aRi_) in zip(aRi_list, aRi_list_)], dtype=np.float32
-    )
+    relative_rotations_angles = compute_relative_rotation_angles(aRi_list, aRi_list_).astype(np.float32)
     return np.all(relative_rotations_angles < angular_error_threshold_degrees)
 
 
@@ -224,44 +237,34 @@ def compare_global_poses(
         return False
 
     # check the presense of valid Pose3 objects in the same location
-    aTi_valid = [i for (i, aTi) in enumerate(aTi_list) if aTi is not None]
-    bTi_valid = [i for (i, bTi) in enumerate(bTi_list) if bTi is not None]
-    if aTi_valid != bTi_valid:
+    valid_idxs = _get_common_valid_indices(aTi_list, bTi_list)
+    if valid_idxs is None:
         return False
 
-    if len(aTi_valid) <= 1:
+    if len(valid_idxs) <= 1:
         # we need >= two entries going forward for meaningful comparisons
         return False
 
     # align the remaining poses
-    aTi_list = [aTi_list[i] for i in aTi_valid]
-    bTi_list = [bTi_list[i] for i in bTi_valid]
+    if len(valid_idxs) != len(aTi_list):
+        aTi_list = [aTi_list[i] for i in valid_idxs]
+        bTi_list = [bTi_list[i] for i in valid_idxs]
 
     #  We set frame "a" the target/reference
     aTi_list_, _ = align_poses_sim3(aTi_list, bTi_list)
 
-    rotations_equal = all(
-        [
-            compute_relative_rotation_angle(aTi.rotation(), aTi_.rotation()) < rot_angular_error_thresh_degrees
-            for (aTi, aTi_) in zip(aTi_list, aTi_list_)
-        ]
-    )
-    translations_equal = all(
-        [
-            np.allclose(aTi.translation(), aTi_.translation(), atol=trans_err_atol, rtol=trans_err_rtol)
-            for (aTi, aTi_) in zip(aTi_list, aTi_list_)
-        ]
+    # compute the rotation errors once, as they are needed for both the check and the log
+    rotation_errors = compute_relative_rotation_angles(
+        [aTi.rotation() for aTi in aTi_list], [aTi_.rotation() for aTi_ in aTi_list_]
     )
+    rotations_equal = bool(np.all(rotation_errors < rot_angular_error_thresh_degrees))
+
+    # stack the translations once, and compare all of them in a single vectorized pass
+    ati = np.array([aTi.translation() for aTi in aTi_list])
+    ati_ = np.array([aTi_.translation() for aTi_ in aTi_list_])
+    translations_equal = np.allclose(ati, ati_, atol=trans_err_atol, rtol=trans_err_rtol)
     if verbose:
-        rotation_errors = np.array(
-            [
-                compute_relative_rotation_angle(aTi.rotation(), aTi_.rotation())
-                for (aTi, aTi_) in zip(aTi_list, aTi_list_)
-            ]
-        )
-        translation_errors = np.array(
-            [np.linalg.norm(aTi.translation() - aTi_.translation()) for (aTi, aTi_) in zip(aTi_list, aTi_list_)]
-        )
+        translation_errors = np.linalg.norm(ati - ati_, axis=1)
         logger.info("Comparison Rotation Errors (degrees): " + str(np.round(rotation_errors, 2)))
         logger.info("Comparison Translation Errors: " + str(np.round(translation_errors, 2)))
 
@@ -293,6 +296,30 @@ def compute_relative_rotation_angle(R_1: Optional[Rot3], R_2: Optional[Rot3]) ->
     return relative_rot_angle_deg
 
 
+def compute_relative_rotation_angles(R_1_list: List[Rot3], R_2_list: List[Rot3]) -> np.ndarray:
+    """Compute the angles between corresponding pairs of rotations, in a single batched pass.
+
+    Note: equivalent to calling compute_relative_rotation_angle() on each pair, without the per-pair overhead.
+
+    Args:
+        R_1_list: the first rotation of each pair.
+        R_2_list: the second rotation of each pair.
+
+    Returns:
+        array of shape (N,) with the angle between each pair of rotations, in degrees.
+    """
+    if len(R_1_list) == 0:
+        return np.zeros((0,))
+
+    R_1 = np.array([R.matrix() for R in R_1_list])
+    R_2 = np.array([R.matrix() for R in R_2_list])
+    # R_1.between(R_2) is R_1^T * R_2
+    relative_rots = np.einsum("nji,njk->nik", R_1, R_2)
+    scaled_axes = Rotation.from_matrix(relative_rots).as_rotvec()
+    relative_rot_angles_rad = np.linalg.norm(scaled_axes, axis=1)
+    return np.rad2deg(relative_rot_angles_rad)
+
+
 def compute_relative_unit_translation_angle(U_1: Optional[Unit3], U_2: Optional[Unit3]) -> Optional[float]:
     """Compute the angle between two unit-translations.
 
@@ -396,8 +423,11 @@ def get_points_within_radius_of_cameras(
     # each row represents attributes for a single point
     # each column represents
     is_nearby_matrix = np.zeros((num_points, num_poses), dtype=bool)
+    # compare squared distances, computed as row-wise dot products, to avoid a square root per point
+    radius_sq = radius**2
     for j, wTi in enumerate(wTi_list):
-        is_nearby_matrix[:, j] = np.linalg.norm(points_3d - wTi.translation(), axis=1) < radius
+        diff = points_3d - wTi.translation()
+        is_nearby_matrix[:, j] = np.einsum("ij,ij->i", diff, diff) < radius_sq
 
     is_nearby_to_any_cam = np.any(is_nearby_matrix, axis=1)
     nearby_points_3d = points_3d[is_nearby_to_any_cam]
@@ -86,6 +86,23 @@ class TestMVSUtils(unittest.TestCase):
         )
         self.assertTrue(np.allclose(computed, expected))
 
+    def test_calculate_triangulation_angles_in_degrees_from_centers(self) -> None:
+        """Test the batched computation of triangulation angles, where every point has its own pair of cameras.
+
+        The first triplet is the 90 degree example above, the second one has the point on the line through both
+        camera centers (0 degrees), and the third one sees the point from opposite sides (180 degrees).
+        """
+        camera_centers_1 = np.array([[0, 0, 0], [0, 0, 0], [0, 0, 0]])
+        camera_centers_2 = np.array([[10, 0, 0], [0, 0, 1], [0, 0, 10]])
+        points_3d = np.array([[5, 0, 5], [0, 0, 5], [0, 0, 5]])
+
+        expected = np.array([90, 0, 180])
+
+        computed = mvs_utils.calculate_triangulation_angles_in_degrees_from_centers(
+            camera_centers_1=camera_centers_1, camera_centers_2=camera_centers_2, points_3d=points_3d
+        )
+        self.assertTrue(np.allclose(computed, expected))
+
     def test_piecewise_gaussian_below_expect_baseline_angle(self) -> None:
         """Unit test for the case that the angle between two coordinates is below the expect baseline angle,
         where sigma_1 is used to calculate the score"""
@@ -102,6 +119,16 @@ class TestMVSUtils(unittest.TestCase):
 
         self.assertAlmostEqual(score, np.exp(-(5.0 ** 2) / (2 * 10.0 ** 2)))
 
+    def test_piecewise_gaussian_vectorized(self) -> None:
+        """Unit test for an array of angles on both sides of the expect baseline angle, where sigma_1 is used for
+        entries no larger than theta_0 and sigma_2 for the rest"""
+
+        thetas = np.array([4.0, 5.0, 10.0])
+        scores = mvs_utils.piecewise_gaussian(theta=thetas, theta_0=5, sigma_1=1, sigma_2=10)
+
+        expected = np.array([np.exp(-(1.0 ** 2) / (2 * 1.0 ** 2)), 1.0, np.exp(-(5.0 ** 2) / (2 * 10.0 ** 2))])
+        self.assertTrue(np.allclose(scores, expected))
+
     def test_cart_to_homogenous(self) -> None:
         """Test the cart_to_homogenous function correctly produces the homogenous coordinates"""
 
@@ -110,6 +137,32 @@ class TestMVSUtils(unittest.TestCase):
         uv_homo = mvs_utils.cart_to_homogenous(uv)
 
         self.assertTrue(uv_homo.shape == (3, n))
+        self.assertTrue(np.array_equal(uv_homo, np.vstack([uv, np.ones((1, n))])))
+
+    def test_cart_to_homogenous_dtype(self) -> None:
+        """Test that cart_to_homogenous keeps float32/float64 inputs' dtype, and converts other inputs to float64"""
+
+        uv_float32 = np.random.random([2, 10]).astype(np.float32)
+        self.assertEqual(mvs_utils.cart_to_homogenous(uv_float32).dtype, np.float32)
+
+        uv_float64 = np.random.random([2, 10])
+        self.assertEqual(mvs_utils.cart_to_homogenous(uv_float64).dtype, np.float64)
+
+        uv_float16 = np.random.random([2, 10]).astype(np.float16)
+        self.assertEqual(mvs_utils.cart_to_homogenous(uv_float16).dtype, np.float64)
+
+        uv_int = np.arange(20).reshape(2, 10)
+        self.assertEqual(mvs_utils.cart_to_homogenous(uv_int).dtype, np.float64)
+
+        uv_uint8 = np.arange(20, dtype=np.uint8).reshape(2, 10)
+        homogenous_uv_uint8 = mvs_utils.cart_to_homogenous(uv_uint8)
+        self.assertEqual(homogenous_uv_uint8.dtype, np.float64)
+        np.testing.assert_array_equal(homogenous_uv_uint8[:2], uv_uint8)
+
+        uv_bool = np.random.random([2, 10]) > 0.5
+        homogenous_uv_bool = mvs_utils.cart_to_homogenous(uv_bool)
+        self.assertEqual(homogenous_uv_bool.dtype, np.float64)
+        np.testing.assert_array_equal(homogenous_uv_bool[:2], uv_bool.astype(np.float64))
 
     def test_estimate_minimum_voxel_size(self) -> None:
         """Test the estimate_minimum_voxel_size function correctly produces the minimum voxel size"""
@@ -41,6 +41,10 @@ class TestHiltiLoader(unittest.TestCase):
         for i in {2, 12, 32}:
             self.assertEqual(self.loader.camera_from_image(i), 2)
 
+    def test_get_image_full_res_missing_index(self) -> None:
+        with self.assertRaises(IndexError):
+            self.loader.get_image_full_res(100)
+
     def test_number_of_absolute_pose_priors(self) -> None:
         rig_idxs = list(self.loader._w_T_imu.keys())
         self.assertListEqual(rig_idxs, list(range(3)))
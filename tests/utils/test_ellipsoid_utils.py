@@ -291,6 +291,32 @@ class TestEllipsoidUtils(unittest.TestCase):
                 (computed_Vt[rowIdx, :] == -1 * expected_Vt[rowIdx, :])
             )
 
+    def test_get_singular_values(self) -> None:
+        """Tests the get_singular_values() function by checking that it outputs the same singular values as
+        get_right_singular_vectors()."""
+
+        # fmt: off
+        points = np.array(
+            [
+                [3,4,5],
+                [4,1,3],
+                [9,1,2],
+                [6,3,1]
+            ]
+        )
+        # fmt: on
+
+        _, expected_singular_values = ellipsoid_utils.get_right_singular_vectors(points)
+        computed_singular_values = ellipsoid_utils.get_singular_values(points)
+
+        np.testing.assert_allclose(computed_singular_values, expected_singular_values)
+
+    def test_get_singular_values_wrong_dims(self) -> None:
+        """Tests the get_singular_values() function with 6 sample points of 2 dimensions."""
+
+        sample_points = np.array([[1, 1], [-1, 1], [-2, 2], [-1, -1], [1, -1], [2, -2]])
+        self.assertRaises(TypeError, ellipsoid_utils.get_singular_values, sample_points)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -115,6 +115,22 @@ class TestGeometryComparisons(unittest.TestCase):
         assert isinstance(aSb, Similarity3)
         self.__assert_equality_on_pose3s(aTi_list_, aTi_list)
 
+    def test_compare_global_poses_after_sim3_transform(self):
+        """Check that poses which differ only by a Sim(3) transformation are considered equal."""
+        aSb = Similarity3(Rot3.RzRyRx(0, 0, np.deg2rad(30)), np.array([5, 10, -5]), 0.7)
+        aTi_list = sample_poses.CIRCLE_TWO_EDGES_GLOBAL_POSES
+        bTi_list = [aSb.transformFrom(x) for x in aTi_list]
+
+        self.assertTrue(geometry_comparisons.compare_global_poses(aTi_list, bTi_list))
+
+    def test_compare_global_poses_with_translation_error(self):
+        """Check that a large translation error on a single pose fails the comparison."""
+        aTi_list = sample_poses.CIRCLE_TWO_EDGES_GLOBAL_POSES
+        bTi_list = list(aTi_list)
+        bTi_list[1] = Pose3(aTi_list[1].rotation(), aTi_list[1].translation() + np.array([0, 0, 5]))
+
+        self.assertFalse(geometry_comparisons.compare_global_poses(aTi_list, bTi_list))
+
     @patch(
         "gtsfm.utils.geometry_comparisons.align_rotations",
         return_value=[
@@ -254,6 +270,18 @@ class TestGeometryComparisons(unittest.TestCase):
 
         np.testing.assert_allclose(computed_deg, expected_deg, rtol=1e-3, atol=1e-3)
 
+    def test_compute_relative_rotation_angles(self) -> None:
+        """Check that the batched angles match the angles computed one pair at a time."""
+        R_1_list = [Rot3.RzRyRx(0, np.deg2rad(25), 0), Rot3.RzRyRx(0.1, -0.4, 0.7), Rot3()]
+        R_2_list = [Rot3.RzRyRx(0, np.deg2rad(-22), 0), Rot3.RzRyRx(-1.2, 0.3, 0.2), Rot3()]
+
+        computed = geometry_comparisons.compute_relative_rotation_angles(R_1_list, R_2_list)
+        expected = [
+            geometry_comparisons.compute_relative_rotation_angle(R_1, R_2) for R_1, R_2 in zip(R_1_list, R_2_list)
+        ]
+        np.testing.assert_allclose(computed, expected, atol=1e-8)
+        self.assertAlmostEqual(computed[0], 47, places=5)
+
     def test_compute_relative_unit_translation_angle(self):
         """Tests the relative angle between two unit-translations."""
 